@@ -8,6 +8,9 @@ setup(
     packages=find_packages(),
     python_requires=">=3.11",
     install_requires=[],
+    extras_require={
+        "fast": ["orjson"],
+    },
     entry_points={
         "console_scripts": [
             "vical = vical.__main__:run",
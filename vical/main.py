@@ -1,6 +1,6 @@
 # vical/main.py
 from .ui.ui_main import UI
-from .subcalendar import Subcalendar, load_subcalendars
+from .subcalendar import load_subcalendars
 
 def main(stdscr):
     subcalendars = load_subcalendars()
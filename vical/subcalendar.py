@@ -1,30 +1,67 @@
 # vical/subcalendar.py
 import os
 import json
-from datetime import datetime, date
-from typing import List
+import bisect
+import uuid
+from operator import attrgetter
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List
+
+try:
+    import orjson # optional, much faster (de)serialization
+except ImportError:
+    orjson = None
 
 DATA_DIR = os.path.expanduser("~/.local/share/vical")
-DATA_FILE = os.path.join(DATA_DIR, "subcalendars.json")
-DATE_FMT = "%Y%m%d"
+MANIFEST_FILENAME = "manifest.json"        # subcalendar ids, names, colors and visibility
+SUBCAL_DIRNAME = "subcalendars"            # one <id>.json task file per subcalendar
+LEGACY_FILENAME = "subcalendars.json"      # pre-manifest single-file layout
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(date_str: str) -> date:
+    # fixed-width YYYYMMDD, much cheaper than strptime
+    return date(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
 
 
 class Task:
+    # tasks are the most numerous objects, so skip the per-instance __dict__
+    __slots__ = ("name", "completed", "date", "year", "month", "day", "_sort_key")
+
     def __init__(self, name: str, date_str: str, completed: bool = False):
         self.name = name
-        self.date_str = date_str
         self.completed = bool(completed)
+        self._set_date(_parse_date_str(date_str))
 
-        self.date: date = datetime.strptime(date_str, DATE_FMT).date()
-        self.year = self.date.year
-        self.month = self.date.month
-        self.day = self.date.day
+    @classmethod
+    def from_date(cls, name: str, d: date, completed: bool = False) -> "Task":
+        # skips the date_str format/parse round trip for tasks created in the UI
+        task = cls.__new__(cls)
+        task.name = name
+        task.completed = bool(completed)
+        task._set_date(d)
+        return task
+
+    def _set_date(self, d: date):
+        self.date = d
+        self.year = d.year
+        self.month = d.month
+        self.day = d.day
+        self._sort_key = (d, self.name)
+
+    @property
+    def date_str(self) -> str:
+        return f"{self.year:04d}{self.month:02d}{self.day:02d}"
+
+    def __lt__(self, other: "Task") -> bool:
+        return self._sort_key < other._sort_key
 
     def toggle_completed(self):
         self.completed = not self.completed
 
     def copy(self):
-        return Task(self.name, self.date_str, self.completed)
+        return Task.from_date(self.name, self.date, self.completed)
 
     def to_dict(self) -> dict:
         return {
@@ -43,24 +80,48 @@ class Task:
 
 
 class Subcalendar:
-    def __init__(self, name: str, color: int = 1, hidden: bool = False):
+    __slots__ = ("uid", "name", "color", "hidden", "tasks", "_by_day", "dirty", "version")
+
+    def __init__(self, name: str, color: int = 1, hidden: bool = False, uid: str = None):
+        # task files are named by uid, not name, so renames, duplicate names and
+        # path characters in names can't make two subcalendars share a file
+        self.uid = uid or uuid.uuid4().hex
         self.name = name
         self.color = color
         self.hidden = hidden
         self.tasks: List[Task] = []
+        self._by_day: Dict[date, List[Task]] = {} # date -> sorted tasks
+        self.dirty = True # task file needs writing on next save
+        self.version = 0 # bumped whenever the task set changes, never reset
 
     def insert_task(self, task: Task):
-        self.tasks.append(task)
-        self.sort_tasks()
+        bisect.insort(self.tasks, task)
+        bisect.insort(self._by_day.setdefault(task.date, []), task)
+        self.dirty = True
+        self.version += 1
 
     def pop_task(self, task: Task):
-        if task in self.tasks:
+        try:
             self.tasks.remove(task)
-            return task
-        return None
+        except ValueError:
+            return None
+        bucket = self._by_day[task.date]
+        bucket.remove(task)
+        if not bucket:
+            del self._by_day[task.date]
+        self.dirty = True
+        self.version += 1
+        return task
+
+    def tasks_on(self, d: date) -> List[Task]:
+        return self._by_day.get(d, [])
 
     def sort_tasks(self):
-        self.tasks.sort(key=lambda t: (t.year, t.month, t.day, t.name))
+        self.tasks.sort(key=attrgetter("_sort_key"))
+        self._by_day = {}
+        for t in self.tasks:
+            self._by_day.setdefault(t.date, []).append(t)
+        self.version += 1
 
     def toggle_hidden(self):
         self.hidden = not self.hidden
@@ -71,11 +132,17 @@ class Subcalendar:
     def change_color(self, color: int):
         self.color = color
 
-    def to_dict(self) -> dict:
+    def meta_dict(self) -> dict:
         return {
+            "id": self.uid,
             "name": self.name,
             "color": self.color,
             "hidden": self.hidden,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            **self.meta_dict(),
             "tasks": [t.to_dict() for t in self.tasks],
         }
 
@@ -85,6 +152,7 @@ class Subcalendar:
             name=data["name"],
             color=data.get("color", 1),
             hidden=data.get("hidden", False),
+            uid=data.get("id"),
         )
 
         for task_data in data.get("tasks", []):
@@ -94,28 +162,82 @@ class Subcalendar:
         return subcal
 
 
-def save_subcalendars(subcalendars: List[Subcalendar], filepath: str = DATA_FILE):
-    os.makedirs(DATA_DIR, exist_ok=True)
+def _write_json(path: str, data):
+    # serialize up front so the file gets a single write, then swap it in
+    # so a crash never leaves a partial file
+    if orjson is not None:
+        buf = orjson.dumps(data)
+    else:
+        buf = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(
-            [sc.to_dict() for sc in subcalendars],
-            f,
-            indent=2,
-            ensure_ascii=False,
-        )
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 
-def load_subcalendars(filepath: str = DATA_FILE) -> List[Subcalendar]:
-    if not os.path.exists(filepath):
+def _read_json(path: str):
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_subcalendars(subcalendars: List[Subcalendar], datadir: str = DATA_DIR):
+    subcal_dir = os.path.join(datadir, SUBCAL_DIRNAME)
+    os.makedirs(subcal_dir, exist_ok=True)
+
+    # only rewrite task files for subcalendars that changed since the last save
+    for sc in subcalendars:
+        if sc.dirty:
+            _write_json(os.path.join(subcal_dir, f"{sc.uid}.json"),
+                        [t.to_dict() for t in sc.tasks])
+
+    _write_json(os.path.join(datadir, MANIFEST_FILENAME),
+                [sc.meta_dict() for sc in subcalendars])
+
+    # drop task files left behind by deleted or renamed subcalendars
+    keep = {f"{sc.uid}.json" for sc in subcalendars}
+    for fname in os.listdir(subcal_dir):
+        if fname.endswith(".json") and fname not in keep:
+            os.remove(os.path.join(subcal_dir, fname))
+
+    for sc in subcalendars:
+        sc.dirty = False
+
+
+def load_subcalendars(datadir: str = DATA_DIR) -> List[Subcalendar]:
+    manifest_path = os.path.join(datadir, MANIFEST_FILENAME)
+    legacy_path = os.path.join(datadir, LEGACY_FILENAME)
+
+    if not os.path.exists(manifest_path):
+        if os.path.exists(legacy_path):
+            # single-file layout from older versions, migrated on the next write
+            data = _read_json(legacy_path)
+            if not isinstance(data, list):
+                raise ValueError("Invalid vical data format: expected a list")
+            return [Subcalendar.from_dict(d) for d in data]
+
         default = Subcalendar("default", 1) # default subcalendar
-        save_subcalendars([default], filepath)
+        save_subcalendars([default], datadir)
         return [default]
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    manifest = _read_json(manifest_path)
+
+    if not isinstance(manifest, list):
+        raise ValueError("Invalid vical manifest format: expected a list")
 
-    if not isinstance(data, list):
-        raise ValueError("Invalid vical data format: expected a list")
+    subcalendars = []
+    for meta in manifest:
+        task_path = os.path.join(datadir, SUBCAL_DIRNAME, f"{meta['id']}.json")
+        tasks = []
+        if os.path.exists(task_path):
+            tasks = _read_json(task_path)
+        subcal = Subcalendar.from_dict({**meta, "tasks": tasks})
+        subcal.dirty = False # matches what is on disk
+        subcalendars.append(subcal)
 
-    return [Subcalendar.from_dict(d) for d in data]
+    return subcalendars
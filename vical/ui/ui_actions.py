@@ -1,8 +1,9 @@
 # vical/ui/ui_actions.py
 import curses
-from datetime import date, timedelta
+from datetime import date
 from ..subcalendar import Subcalendar, save_subcalendars, Task
 from .ui_draw import update_prompt, draw_help, draw_screen
+from ..utils import contains_bad_chars
 
 def _confirm(ui, text):
     update_prompt(ui, text)
@@ -13,7 +14,7 @@ def _confirm(ui, text):
 def write(ui):
     try:
         save_subcalendars(ui.subcalendars)
-        ui.last_saved_snapshot = ui.snapshot_state()
+        ui.saved_history_op = ui.history_top()
         ui.saved = True
         ui.msg = ("Changes saved", 0)
     except Exception as e:
@@ -38,24 +39,22 @@ def force_quit(ui):
 
 
 def undo(ui):
-    if not ui.history_undo:
+    if not ui.undo_count:
         ui.msg = ("Nothing to undo", 1)
         return
 
-    ui.history_redo.append(ui.snapshot_state())  # save current for redo
-    snapshot = ui.history_undo.pop()
-    ui.restore_state(snapshot)
+    ui.undo_count -= 1
+    ui.apply_history_op(ui.history[ui.undo_count], undo=True)
     ui.msg = ("Undo", 0)
 
 
 def redo(ui):
-    if not ui.history_redo:
+    if ui.undo_count == len(ui.history):
         ui.msg = ("Nothing to redo", 1)
         return
 
-    ui.history_undo.append(ui.snapshot_state())  # save current before redoing
-    snapshot = ui.history_redo.pop()
-    ui.restore_state(snapshot)
+    ui.undo_count += 1
+    ui.apply_history_op(ui.history[ui.undo_count - 1])
     ui.msg = ("Redo", 0)
 
 
@@ -68,46 +67,48 @@ def show_help(ui):
 
 # movement
 def move(ui, motion):
-    count = int(ui.count_buffer) if ui.count_buffer else 1
-    new_date = ui.selected_date + timedelta(days=motion * count)
+    count = ui.count if ui.count_buffer else 1
+    delta = motion * count
 
     try:
-        ui.change_date(new_date, motion * count)
+        # plain int arithmetic on the ordinal, no intermediate timedelta
+        new_date = date.fromordinal(ui.selected_date.toordinal() + delta)
+        ui.change_date(new_date, delta)
     except Exception as e:
+        ui.reset_count() # change_date resets it on success
         ui.msg = (f"{e}", 1)
 
 
+# goto date string parsers keyed by length: (date_str, current year) -> (year, month, day)
+_GOTO_PARSERS = {
+    8: lambda s, y: (int(s[4:]), int(s[:2]), int(s[2:4])), # MMDDYYYY
+    6: lambda s, y: (int(s[2:]), int(s[:2]), 1),           # MMYYYY
+    4: lambda s, y: (y, int(s[:2]), int(s[2:4])),          # MMDD
+    2: lambda s, y: (y, int(s), 1),                        # MM
+    1: lambda s, y: (y, int(s), 1),                        # M
+}
+
+
 def goto(ui):
     date_str = ui.count_buffer # use count_buffer as date string
 
     try:
         if(date_str):
-            if len(date_str) == 8: # 8 digits: goto to MMDDYYYY
-                month = int(date_str[:2])
-                day = int(date_str[2:4])
-                year = int(date_str[4:])
-            elif len(date_str) == 6: # 6 digits: goto to MMYYYY
-                month = int(date_str[:2])
-                day = 1
-                year = int(date_str[2:6])
-            elif len(date_str) == 4: # 4 digits: goto to MMDD
-                month = int(date_str[:2])
-                day = int(date_str[2:4])
-                year = ui.selected_date.year
-            elif len(date_str) in (1, 2): # 1 or 2 digits: goto to M or MM
-                month = int(date_str)
-                day = 1
-                year = ui.selected_date.year
-            new_date = date(year, month, day)
+            parser = _GOTO_PARSERS.get(len(date_str))
+            if not parser:
+                raise ValueError(f"Invalid date: {date_str}")
+            new_date = date(*parser(date_str, ui.selected_date.year))
             ui.msg = (f"goto: {new_date:%b %d, %Y}", 0)
         else:
+            # not ui.today, which is refreshed before the blocking getch and can be a day old here.
+            # main_loop still notices the rollover and moves the today highlight
             new_date = date.today() # jump to today if date string is empty
             ui.msg = ("goto: today", 0)
 
         ui.change_date(new_date)
 
     except Exception as e:
-        ui.count_buffer = ''
+        ui.reset_count()
         ui.msg = (f"{e}", 1)
 
 
@@ -128,13 +129,13 @@ def new_task(ui):
         ui.msg = ("Task name cannot be blank", 1)
         return
 
-    date_str = f"{selected_date.year}{selected_date.month:02d}{selected_date.day:02d}"
-    ui.selected_subcal.insert_task(Task(name, date_str, 0))
+    task = Task.from_date(name, selected_date)
+    ui.selected_subcal.insert_task(task)
+    ui.push_history(("insert", ui.selected_subcal, task))
+    # a queued motion may move off this day before the next draw
+    ui.dirty_days.add(selected_date)
     ui.msg = (f"Created new task: '{name}'", 0)
     ui.saved = False
-    ui.redraw = True
-
-    ui.push_history()
 
 # TODO: these only work when the parent subcalendar is selected. these actions should be agnostic of the selected subcalendar
 def yank_task(ui):
@@ -151,88 +152,76 @@ def yank_task(ui):
 
 
 def delete_task(ui):
-    """Delete current task, store in registers."""
-    task = ui.selected_task
-    if not task:
+    """Delete current task (count tasks with a count, e.g. 3dd), store in registers."""
+    tasks = ui.get_tasks_for_selected_day()
+    if not tasks:
         ui.msg = ("No task selected", 1)
         return
-    
-    ui.push_history()
 
-    subcal = ui.selected_subcal
-    removed = subcal.pop_task(task)
-    if not removed:
+    count = max(ui.count, 1)
+    ui.reset_count()
+    start = ui.selected_task_index % len(tasks)
+    # slice before popping, the cached day list is rebuilt by the first pop
+    ops = []
+    for cal, task in tasks[start:start + count]:
+        removed = cal.pop_task(task)
+        if removed:
+            ops.append(("delete", cal, removed))
+    if not ops:
         ui.msg = ("Failed to delete task", 1)
         return
+    # a counted delete is undone in one step
+    ui.push_history(ops[0] if len(ops) == 1 else ("batch", None, ops))
 
-    # store deleted task
+    # store the first deleted task
+    _, subcal, removed = ops[0]
     entry = (removed.copy(), subcal)
     ui.registers['"'] = entry     # unnamed register
-    ui.registers['1'] = entry     # last delete
-    # shift older deletes 1–8 → 2–9
-    for i in range(9, 1, -1):
-        ui.registers[str(i)] = ui.registers.get(str(i - 1))
+    ui.delete_ring.appendleft(entry)  # last delete becomes "1, older deletes shift to "2-"9
 
-    ui.msg = (f"Deleted '{removed.name}'", 0)
+    ui.dirty_days.add(ui.selected_date)
+    ui.msg = (f"Deleted '{removed.name}'" if len(ops) == 1 else f"Deleted {len(ops)} tasks", 0)
     ui.saved = False
-    ui.redraw = True
     ui.clamp_task_index()
 
-# TODO: these paste functions don't persist, not sure if the issue is with paste or delete
-def paste_task(ui):
-    reg = ui.registers['"']
-    if not reg:
-        ui.msg = ("Nothing to paste", 1)
-        return
-
-    ui.push_history()
-
-    task, original_subcal = reg
-    new_task = task.copy()
-    new_task.year = ui.selected_date.year
-    new_task.month = ui.selected_date.month
-    new_task.day = ui.selected_date.day
-
-    target = original_subcal
-
+def _paste(ui, target):
+    task = ui.registers['"'][0]
+    new_task = Task.from_date(task.name, ui.selected_date, task.completed)
     target.insert_task(new_task)
+    ui.push_history(("insert", target, new_task))
+    ui.dirty_days.add(ui.selected_date)
+
     ui.msg = (f"Pasted '{task.name}' into '{target.name}'", 0)
     ui.saved = False
-    ui.redraw = True
-    
 
 
-def paste_task_to_selected_subcal(ui):
+def paste_task(ui):
     reg = ui.registers['"']
     if not reg:
         ui.msg = ("Nothing to paste", 1)
         return
+    _paste(ui, reg[1])
 
-    ui.push_history()
-
-    task, original_subcal = reg
-    new_task = task.copy()
-    new_task.year = ui.selected_date.year
-    new_task.month = ui.selected_date.month
-    new_task.day = ui.selected_date.day
-
-    target = ui.selected_subcal
 
-    target.insert_task(new_task)
-    ui.msg = (f"Pasted '{task.name}' into '{target.name}'", 0)
-    ui.saved = False
-    ui.redraw = True
+def paste_task_to_selected_subcal(ui):
+    if not ui.registers['"']:
+        ui.msg = ("Nothing to paste", 1)
+        return
+    _paste(ui, ui.selected_subcal)
 
 
 def rename_task(ui):
-    task = ui.selected_task
-    ui.push_history()
+    ui.msg = ("Renaming tasks is not supported yet", 1)
 
 
 def mark_complete(ui):
-    if ui.selected_task:
-        ui.push_history()
-        ui.selected_task.toggle_completed()
+    tasks = ui.get_tasks_for_selected_day()
+    if tasks:
+        cal, task = tasks[ui.selected_task_index % len(tasks)]
+        task.toggle_completed()
+        cal.dirty = True
+        ui.push_history(("toggle", cal, task))
+        ui.dirty_days.add(ui.selected_date)
         ui.saved = False
 
 
@@ -262,12 +251,10 @@ def new_subcal(ui):
     name = ui.promptwin.getstr(0, 22, 50).decode('utf-8').strip()
     curses.noecho()
 
-    if not name:
+    if not name or contains_bad_chars(name):
         ui.msg = (f"Invalid name", 1)
         return
 
-    ui.push_history()
-
     update_prompt(ui, "Choose color (1–5): ")
     for c in range(1, 6):
         ui.promptwin.attron(curses.color_pair(c))
@@ -286,7 +273,9 @@ def new_subcal(ui):
 
     new_cal = Subcalendar(name, color)
     ui.subcalendars.append(new_cal)
+    ui.invalidate_visible_subcals()
     ui.selected_subcal_index = len(ui.subcalendars) - 1
+    ui.push_history(("new_subcal", new_cal, ui.selected_subcal_index))
     ui.msg = (f"Created Subcalendar '{name}'", 0)
     ui.saved = False
 
@@ -298,14 +287,15 @@ def delete_subcal(ui):
         return
 
     confirm = _confirm(ui, f"Delete subcalendar '{subcal.name}'? (y/N): ")
-    if confirm:
+    if not confirm:
         ui.msg = ("Cancelled", 0)
         return
 
-    ui.push_history()
-
     try:
+        index = ui.subcalendars.index(subcal)
         ui.subcalendars.remove(subcal)
+        ui.invalidate_visible_subcals()
+        ui.push_history(("delete_subcal", subcal, index))
         ui.msg = (f"Deleted subcalendar '{subcal.name}'", 0)
         ui.saved = False
         ui.redraw = True
@@ -326,26 +316,25 @@ def rename_subcal(ui):
 def hide_subcal(ui):
     subcal = ui.selected_subcal
     subcal.toggle_hidden()
+    ui.invalidate_visible_subcals()
     ui.msg = (f"{subcal.name} {'hidden' if subcal.hidden else 'unhidden'}", 0)
     ui.redraw = True
 
 
-def cycle_subcal(ui, direction: int):
-    if not ui.subcalendars:
-        return
-    ui.selected_subcal_index = (ui.selected_subcal_index + direction) % len(ui.subcalendars)
-
-
 def next_subcal(ui):
-    if not ui.subcalendars:
+    n = len(ui.subcalendars)
+    if not n:
         return
-    ui.selected_subcal_index = (ui.selected_subcal_index + 1) % len(ui.subcalendars)
+    i = ui.selected_subcal_index + 1
+    ui.selected_subcal_index = 0 if i >= n else i # wrap without a modulo
 
 
 def prev_subcal(ui):
-    if not ui.subcalendars:
+    n = len(ui.subcalendars)
+    if not n:
         return
-    ui.selected_subcal_index = (ui.selected_subcal_index - 1) % len(ui.subcalendars)
+    i = ui.selected_subcal_index
+    ui.selected_subcal_index = i - 1 if i else n - 1
 
 
 def change_subcal_color(ui):
@@ -353,8 +342,6 @@ def change_subcal_color(ui):
     if not subcal:
         return
 
-    ui.push_history()
-
     update_prompt(ui, f"Choose color for '{subcal.name}': ")
     for c in range(1, 6):
         ui.promptwin.attron(curses.color_pair(c))
@@ -366,8 +353,11 @@ def change_subcal_color(ui):
         key = ui.promptwin.getch()
         if ord('1') <= key <= ord('5'):
             color = key - ord('0')
+            ui.push_history(("color", subcal, subcal.color, color))
             subcal.change_color(color)
             ui.msg = (f"Color changed for {subcal.name}", 0)
+            ui.saved = False
+            ui.redraw = True # task colors change in every cell
             return
         elif key == 27:
             return
\ No newline at end of file
@@ -1,7 +1,6 @@
 # vical/ui/ui_draw.py
 import curses
-from datetime import date, timedelta
-from ..utils import get_day_name, get_month_name
+from ..utils import get_day_name, get_month_name, get_month_grid
 
 def update_prompt(ui, text):
     ui.promptwin.erase()
@@ -24,7 +23,7 @@ def _draw_prompt_status(ui):
 
     status_prefix = (
         f"{'[+]' if not ui.saved else ''}"                 # unsaved marker
-        f"{f'  {ui.operator} ' if ui.operator else ' '}"   # operator
+        f"{f'  {chr(ui.operator)} ' if ui.operator else ' '}"   # operator
         f"{f'  {ui.count_buffer}' if ui.count_buffer else ''}"           # count
         f"  {ui.last_motion}"                                   # motion
         f"{f'  {ui.redraw} {ui.redraw_counter}' if ui.debug else ''}"  # redraw counter
@@ -92,12 +91,13 @@ def _draw_calendar_base(ui):
 
 
 # draw a single day cell (number, tasks, highlights)
-def _draw_day_cell(ui, year, month, day):
-    today = date.today()
-    selected = ui.selected_date
+def _draw_day_cell(ui, d):
+    # date objects compare in one C call, so compare them once up front instead of (y, m, d) tuples
+    is_selected = d == ui.selected_date
+    day = d.day
 
     # calculate cell index relative to first visible date
-    idx = (date(year, month, day) - ui.first_visible_date).days
+    idx = d.toordinal() - ui.first_visible_date.toordinal()
     pos_y = (idx // 7) * ui.mainwin_hfactor + 1
     pos_x = (idx % 7) * ui.mainwin_wfactor + 1
     base_y = pos_y + 1
@@ -116,12 +116,12 @@ def _draw_day_cell(ui, year, month, day):
     # day numbers
     attr = 0
     # dim day numbers outside selected month
-    if month != ui.selected_date.month:
+    if d.month != ui.selected_date.month:
         attr |= curses.color_pair(6)  # dim color
     else:
-        if (year, month, day) == (today.year, today.month, today.day):
+        if d == ui.today:
             attr |= curses.color_pair(7) # current date
-        if (year, month, day) == (selected.year, selected.month, selected.day):
+        if is_selected:
             attr |= curses.A_REVERSE # selected date
 
     try:
@@ -134,22 +134,20 @@ def _draw_day_cell(ui, year, month, day):
     # tasks
     max_per_day = ui.mainwin_hfactor - 2
     tasks = []
-    for cal in ui.subcalendars:
-        if cal.hidden:
-            continue
-        for t in cal.tasks:
-            if (t.year, t.month, t.day) == (year, month, day):
-                tasks.append((cal, t))
-
-    scroll_offset = ui.task_scroll_offset if (year, month, day) == (selected.year, selected.month, selected.day) else 0
+    append = tasks.append
+    for cal in ui.visible_subcalendars:
+        for t in cal.tasks_on(d):
+            append((cal, t))
+
+    scroll_offset = ui.task_scroll_offset if is_selected else 0
     visible = tasks[scroll_offset:scroll_offset + max_per_day]
-    selected_index = ui.selected_task_index if (year, month, day) == (selected.year, selected.month, selected.day) else -1
+    selected_index = ui.selected_task_index if is_selected else -1
 
     for i, (cal, t) in enumerate(visible):
         y = base_y + i
         attr = curses.color_pair(cal.color)
         text = f"{'✓ ' if t.completed else ''}{t.name[:cell_w - (2 if t.completed else 0)]}"
-        if (year, month, day) == (selected.year, selected.month, selected.day) and (scroll_offset + i) == selected_index:
+        if (scroll_offset + i) == selected_index:
             attr |= curses.A_REVERSE
 
         try:
@@ -173,18 +171,12 @@ def _draw_day_cell(ui, year, month, day):
 # draw a full 6x7 calendar grid of day cells, starting from the last sunday before the 1st of the month
 def _draw_full_grid(ui):
     _draw_calendar_base(ui)
-    year, month = ui.selected_date.year, ui.selected_date.month
-    first_of_month = date(year, month, 1)
-
-    # last sunday before the first day of the month
-    offset = (first_of_month.weekday() + 1) % 7  # Mon=0 Sun=6
-    start_date = first_of_month - timedelta(days=offset)
-    ui.first_visible_date = start_date
+    grid = get_month_grid(ui.selected_date.year, ui.selected_date.month)
+    ui.first_visible_date = grid[0]
 
     # draw 42 days (6 weeks)
-    for i in range(42):
-        d = start_date + timedelta(days=i)
-        _draw_day_cell(ui, d.year, d.month, d.day)
+    for d in grid:
+        _draw_day_cell(ui, d)
 
 
 def draw_screen(ui):
@@ -193,18 +185,25 @@ def draw_screen(ui):
         _draw_full_grid(ui)
         ui.redraw_counter += 1
         ui.stdscr.refresh()
-        ui.last_selected_date = ui.selected_date # this line fixes a bug, #TODO pass selected date directly to draw_day_cell
     else:
         # otherwise, we only redraw only necessary day cells
+        first = ui.first_visible_date.toordinal()
+        for d in ui.dirty_days:
+            # days outside the visible grid get drawn on the next full redraw anyway
+            if 0 <= d.toordinal() - first < 42:
+                _draw_day_cell(ui, d)
+
         if ui.last_selected_date != ui.selected_date:
             # redraw the old day cell to remove highlight
-            _draw_day_cell(ui, ui.last_selected_date.year, ui.last_selected_date.month, ui.last_selected_date.day)
+            _draw_day_cell(ui, ui.last_selected_date)
 
-        _draw_day_cell(ui, ui.selected_date.year, ui.selected_date.month, ui.selected_date.day)
+        _draw_day_cell(ui, ui.selected_date)
 
     _draw_prompt_status(ui)
     ui.mainwin.noutrefresh()
     ui.promptwin.noutrefresh()
     curses.doupdate()
     
-    ui.redraw = False
\ No newline at end of file
+    ui.redraw = False
+    ui.dirty_days.clear()
+    ui.last_selected_date = ui.selected_date # date currently highlighted on screen
\ No newline at end of file
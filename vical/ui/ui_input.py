@@ -1,5 +1,6 @@
 # vical/ui/ui_input.py
 import curses
+import sys
 from . import ui_actions
 from .ui_draw import update_prompt
 
@@ -9,11 +10,14 @@ CTRL_J = 10
 CTRL_K = 11
 ENTER = {10, 13}
 BACKSPACE = {curses.KEY_BACKSPACE, 127, 8}
+COLON = ord(':')
+DIGIT_MIN, DIGIT_MAX = ord('0'), ord('9')
+PRINT_MIN, PRINT_MAX = 32, 126 # printable ascii
 
 
 KEYMAP = {}    # key code -> action
 MOTIONS = {}   # key code -> motion value
-OPERATORS = {} # operator char -> operator handler
+OPERATORS = {} # operator key code -> {target key code -> action}
 COMMANDS = {}  # string -> function
 
 
@@ -25,75 +29,75 @@ def register_motion(key, value):
     MOTIONS[key] = value
 
 
-def register_operator(op_char, func):
-    OPERATORS[op_char] = func
+def register_operator(op_char, target_char, func):
+    OPERATORS.setdefault(ord(op_char), {})[ord(target_char)] = func
 
 
 def register_command(name, func):
-    COMMANDS[name] = func
-
-
-def operator_goto(ui, key):
-    if key == ord('g'):
-        ui_actions.goto(ui)
-
-
-def operator_delete(ui, key):
-    if key == ord('d'):
-        ui_actions.delete_task(ui)
-
-
-def operator_change(ui, key):
-    if key == ord('w'):
-        ui_actions.rename_task(ui)
+    COMMANDS[sys.intern(name)] = func
+
+
+# default bindings, loaded with one dict update per table
+_DEFAULT_KEYS = (
+    (ord('u'), ui_actions.undo),
+    (ord('U'), ui_actions.redo),
+    (ord('T'), ui_actions.new_task),
+    (ord('D'), ui_actions.delete_task),
+    (ord('y'), ui_actions.yank_task),
+    (ord('R'), ui_actions.rename_task),
+    (ord('p'), ui_actions.paste_task),
+    (ord('P'), ui_actions.paste_task_to_selected_subcal),
+    (ord('z'), ui_actions.hide_subcal),
+    (SPACE,    ui_actions.mark_complete),
+    (CTRL_J,   ui_actions.scroll_down),
+    (CTRL_K,   ui_actions.scroll_up),
+    (ord('['), ui_actions.prev_subcal),
+    (ord(']'), ui_actions.next_subcal),
+)
+
+_DEFAULT_MOTIONS = (
+    (ord('h'), -1),
+    (curses.KEY_LEFT, -1),
+    (ord('l'), 1),
+    (curses.KEY_RIGHT, 1),
+    (ord('j'), 7),
+    (curses.KEY_DOWN, 7),
+    (ord('k'), -7),
+    (curses.KEY_UP, -7),
+)
+
+_DEFAULT_OPERATORS = {
+    ord('g'): {ord('g'): ui_actions.goto},        # gg
+    ord('d'): {ord('d'): ui_actions.delete_task}, # dd
+    ord('c'): {ord('w'): ui_actions.rename_task}, # cw
+}
+
+_DEFAULT_COMMANDS = tuple((sys.intern(name), func) for name, func in (
+    (":w",      ui_actions.write),
+    (":write",  ui_actions.write),
+    (":q",      ui_actions.quit),
+    (":quit",   ui_actions.quit),
+    (":wq",     ui_actions.write_quit),
+    (":q!",     ui_actions.force_quit),
+    (":quit!",  ui_actions.force_quit),
+    (":help",   ui_actions.show_help),
+    (":undo",   ui_actions.undo),
+    (":redo",   ui_actions.redo),
+    (":nc",     ui_actions.new_subcal),
+    (":dc",     ui_actions.delete_subcal),
+    (":color",  ui_actions.change_subcal_color),
+))
 
 
 def init_default_keys():
-    # normal mode keys
-    register_key(ord('u'), ui_actions.undo)
-    register_key(ord('U'), ui_actions.redo)
-    register_key(ord('T'), ui_actions.new_task)
-    register_key(ord('D'), ui_actions.delete_task)
-    register_key(ord('y'), ui_actions.yank_task)
-    register_key(ord('R'), ui_actions.rename_task)
-    register_key(ord('p'), ui_actions.paste_task)
-    register_key(ord('P'), ui_actions.paste_task_to_selected_subcal)
-    register_key(ord('z'), ui_actions.hide_subcal)
-    register_key(SPACE, ui_actions.mark_complete)
-    register_key(CTRL_J, ui_actions.scroll_down)
-    register_key(CTRL_K, ui_actions.scroll_up)
-    register_key(ord('['), ui_actions.prev_subcal)
-    register_key(ord(']'), ui_actions.next_subcal)
-
-    # motions
-    register_motion(ord('h'), -1)
-    register_motion(curses.KEY_LEFT, -1)
-    register_motion(ord('l'), 1)
-    register_motion(curses.KEY_RIGHT, 1)
-    register_motion(ord('j'), 7)
-    register_motion(curses.KEY_DOWN, 7)
-    register_motion(ord('k'), -7)
-    register_motion(curses.KEY_UP, -7)
-
-    register_operator('g', operator_goto)
-    register_operator('d', operator_delete)
-    register_operator('c', operator_change)
+    KEYMAP.update(_DEFAULT_KEYS)
+    MOTIONS.update(_DEFAULT_MOTIONS)
+    for op, targets in _DEFAULT_OPERATORS.items():
+        OPERATORS.setdefault(op, {}).update(targets)
 
 
 def init_default_commands():
-    register_command(":w",      ui_actions.write)
-    register_command(":write",  ui_actions.write)
-    register_command(":q",      ui_actions.quit)
-    register_command(":quit",   ui_actions.quit)
-    register_command(":wq",     ui_actions.write_quit)
-    register_command(":q!",     ui_actions.force_quit)
-    register_command(":quit!",  ui_actions.force_quit)
-    register_command(":help",   ui_actions.show_help)
-    register_command(":undo",   ui_actions.undo)
-    register_command(":redo",   ui_actions.redo)
-    register_command(":nc",     ui_actions.new_subcal)
-    register_command(":dc",     ui_actions.delete_subcal)
-    register_command(":color",  ui_actions.change_subcal_color)
+    COMMANDS.update(_DEFAULT_COMMANDS)
 
 
 def init_custom_keys():
@@ -104,9 +108,24 @@ def init_custom_commands():
     pass # TODO
 
 
+def peek_key(ui):
+    # non-blocking check for queued input, the key is pushed back for the next getch
+    ui.stdscr.nodelay(True)
+    try:
+        key = ui.stdscr.getch()
+    finally:
+        ui.stdscr.nodelay(False)
+    if key != -1:
+        curses.ungetch(key)
+    return key
+
+
 def handle_key(ui):
     key = ui.stdscr.getch()
     if key == curses.KEY_RESIZE:
+        # coalesce a burst of resize events into a single relayout
+        while peek_key(ui) == curses.KEY_RESIZE:
+            ui.stdscr.getch()
         ui.handle_resize()
     
     return key
@@ -131,49 +150,53 @@ def prompt_getstr(ui):
             return string
             break
         elif k in BACKSPACE:
-            if len(string) > 1:
+            if string:
                 string = string[:-1]
-        elif 32 <= k <= 126:
+        elif PRINT_MIN <= k <= PRINT_MAX:
             string += chr(k)
 
     curses.curs_set(0)
 
 
-def normal_mode_input(ui, key):
-    if ord('0') <= key <= ord('9'):
-        ui.count_buffer += chr(key)
+# hot-path globals are bound as default args so lookups are locals, not module dict probes
+def normal_mode_input(ui, key, _OPERATORS=OPERATORS, _MOTIONS=MOTIONS, _KEYMAP=KEYMAP,
+                      _ESC=ESC, _COLON=COLON, _DIGIT_MIN=DIGIT_MIN, _DIGIT_MAX=DIGIT_MAX,
+                      _move=ui_actions.move, _chr=chr):
+    if _DIGIT_MIN <= key <= _DIGIT_MAX:
+        ui.count_buffer += _chr(key)
+        ui.count = ui.count * 10 + (key - _DIGIT_MIN)
         return
 
-    if chr(key) in OPERATORS:
-        if ui.operator:
-            _apply_operator(ui, key)
-        else:
-            ui.operator = chr(key)
+    if key == _ESC:
+        ui.operator = None
+        ui.reset_count()
         return
 
-    if key == ord(':'):
-        _command_mode_input(ui)
-        return
-
-    if key == ESC:
-        ui.operator = ''
-        ui.count_buffer = ''
+    if key in _OPERATORS and not ui.operator:
+        ui.operator = key # the count stays pending for the operator (3dd)
         return
 
-    if key in MOTIONS:
-        ui_actions.move(ui, MOTIONS[key])
-        return
+    # with an operator pending, any key completes it (dd, gg, cw)
+    if ui.operator:
+        _apply_operator(ui, key)
+    elif key == _COLON:
+        _command_mode_input(ui)
+    elif key in _MOTIONS:
+        _move(ui, _MOTIONS[key])
+    else:
+        action = _KEYMAP.get(key)
+        if action:
+            action(ui)
 
-    action = KEYMAP.get(key)
-    if action:
-        action(ui)
+    # like vi, a count only applies to the command right after it
+    ui.reset_count()
 
 
 
-def _apply_operator(ui, key):
-    handler = OPERATORS.get(ui.operator)
-    if handler: handler(ui, key)
-    ui.operator = ''
+def _apply_operator(ui, key, _OPERATORS=OPERATORS):
+    action = _OPERATORS[ui.operator].get(key)
+    ui.operator = None
+    if action: action(ui)
 
 
 def _command_mode_input(ui):
@@ -190,16 +213,16 @@ def _command_mode_input(ui):
         elif k in BACKSPACE:
             if len(command) > 1:
                 command = command[:-1]
-        elif 32 <= k <= 126:
+        elif PRINT_MIN <= k <= PRINT_MAX:
             command += chr(k)
     curses.curs_set(0)
 
-    ui.count_buffer = ''
+    ui.reset_count()
 
 
-def _execute_command(ui, command):
-    command = command.strip()
-    action = COMMANDS.get(command)
+def _execute_command(ui, command, _COMMANDS=COMMANDS):
+    command = sys.intern(command.strip()) # interned on both sides, key compare is a pointer check
+    action = _COMMANDS.get(command)
     if action:
         action(ui)
     else:
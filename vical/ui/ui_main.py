@@ -1,10 +1,25 @@
 # vical/ui/ui_main.py
 import curses
-import copy
-import time
+import string
+from collections import deque
 from datetime import date
+from functools import lru_cache
 from .ui_draw import draw_screen
-from .ui_input import init_default_keys, init_default_commands, handle_key, normal_mode_input
+from .ui_input import init_default_keys, init_default_commands, handle_key, peek_key, normal_mode_input
+
+# '"' unnamed, '0' last yank, a-z named. "1-"9 live in UI.delete_ring
+_REGISTER_KEYS = ('"', '0', *string.ascii_lowercase)
+
+
+# saved_history_op value once the saved state has left the history, so it never
+# matches history_top() again and the buffer stays modified
+_SAVED_STATE_LOST = object()
+
+
+# motions repeat the same few deltas (+1, -7, ...), so reuse their status strings
+@lru_cache(maxsize=64)
+def _motion_str(motion):
+    return f"{'+' if motion > 0 else ''}{motion}"
 
 
 class UI:
@@ -31,6 +46,9 @@ class UI:
 
         # state
         self.subcalendars = subcalendars
+        self._visible_subcals = None  # cached tuple of non-hidden subcalendars
+        self._day_tasks_key = None  # (date, visible subcals, version sum) of _day_tasks
+        self._day_tasks = []
         self.selected_subcal_index = 0
         self.cell_scroll_index = 0
         self.selected_task_index = 0
@@ -38,20 +56,20 @@ class UI:
 
         self.saved = True
         self.last_motion = ''
-        self.count_buffer = ""
-        self.operator = ""
+        self.count_buffer = ""  # typed digits, also read as a date string by goto
+        self.count = 0          # integer value of count_buffer, kept in step as digits arrive
+        self.operator = None  # pending operator key code
         self.redraw_counter = 0
 
-        self.registers = {
-            '"': None,  # unnamed register
-            **{str(i): None for i in range(10)},                     # 0-9
-            **{chr(c): None for c in range(ord('a'), ord('z') + 1)}  # a-z
-        }
+        self.registers = dict.fromkeys(_REGISTER_KEYS)
+        self.delete_ring = deque(maxlen=9)  # numbered registers 1-9, newest first
 
-        self.history_undo = []
-        self.history_redo = []
+        # operation records, see apply_history_op. history[:undo_count] can be undone,
+        # history[undo_count:] redone; the deque drops the oldest record once full
         self.MAX_HISTORY = 50
-        self.last_saved_snapshot = self.snapshot_state()
+        self.history = deque(maxlen=self.MAX_HISTORY)
+        self.undo_count = 0
+        self.saved_history_op = None  # history_top() at the last write, or _SAVED_STATE_LOST
 
 
         self.msg = ("calicula 0.01 - type :help for help or :q for quit", 0)
@@ -59,9 +77,11 @@ class UI:
 
         self.running = True
         self.redraw = True
+        self.dirty_days = set() # day cells to repaint on the next partial redraw
         self.debug = True
 
-        self.selected_date = date.today()
+        self.today = date.today()  # refreshed once per main loop iteration
+        self.selected_date = self.today
         self.last_selected_date = self.selected_date
 
         init_default_keys()
@@ -69,27 +89,70 @@ class UI:
         self.stdscr.refresh()
 
 
-    def snapshot_state(self):
-        return {
-            "subcalendars": copy.deepcopy(self.subcalendars),
-            "selected_subcal_index": self.selected_subcal_index,
-            "selected_task_index": self.selected_task_index,
-        }
+    # history records describe a single mutation, so undo applies its inverse
+    # instead of restoring a full copy of every subcalendar:
+    #   ("insert", subcal, task)            ("delete", subcal, task)
+    #   ("toggle", subcal, task)            ("color", subcal, old, new)
+    #   ("new_subcal", subcal, index)       ("delete_subcal", subcal, index)
+    #   ("batch", None, [op, ...])          several records undone/redone as one step
+    def push_history(self, op):
+        # a new edit discards whatever could still be redone
+        while len(self.history) > self.undo_count:
+            if self.history.pop() is self.saved_history_op:
+                self.saved_history_op = _SAVED_STATE_LOST
 
+        if len(self.history) == self.MAX_HISTORY:
+            # the append below evicts history[0], and the state after it becomes the
+            # bottom of the stack (history_top() None). the state before it is gone
+            oldest = self.history[0]
+            if self.saved_history_op is oldest:
+                self.saved_history_op = None
+            elif self.saved_history_op is None:
+                self.saved_history_op = _SAVED_STATE_LOST
 
-    def restore_state(self, snapshot):
-        self.subcalendars = copy.deepcopy(snapshot["subcalendars"])
-        self.selected_subcal_index = snapshot["selected_subcal_index"]
-        self.selected_task_index = snapshot["selected_task_index"]
-        self.saved = (snapshot == self.last_saved_snapshot)
-        self.redraw = True
+        self.history.append(op)
+        self.undo_count = len(self.history)
+
+
+    def history_top(self):
+        return self.history[self.undo_count - 1] if self.undo_count else None
 
 
-    def push_history(self):
-        self.history_undo.append(self.snapshot_state())
-        if len(self.history_undo) > self.MAX_HISTORY:
-            self.history_undo.pop(0)
-        self.history_redo.clear()
+    def apply_history_op(self, op, undo=False):
+        self._apply_op_record(op, undo)
+
+        self.selected_subcal_index = max(0, min(self.selected_subcal_index, len(self.subcalendars) - 1))
+        self.clamp_task_index()
+        self.saved = self.history_top() is self.saved_history_op
+
+
+    def _apply_op_record(self, op, undo):
+        kind, subcal = op[0], op[1]
+        if kind == "batch":
+            for sub_op in (reversed(op[2]) if undo else op[2]):
+                self._apply_op_record(sub_op, undo)
+        elif kind in ("insert", "delete"):
+            if (kind == "insert") != undo:
+                subcal.insert_task(op[2])
+            else:
+                subcal.pop_task(op[2])
+            self.dirty_days.add(op[2].date) # only that day's cell changes
+        elif kind == "toggle":
+            op[2].toggle_completed()
+            subcal.dirty = True
+            self.dirty_days.add(op[2].date)
+        elif kind == "color":
+            subcal.change_color(op[2] if undo else op[3])
+            self.redraw = True
+        elif kind in ("new_subcal", "delete_subcal"):
+            if (kind == "new_subcal") != undo:
+                self.subcalendars.insert(op[2], subcal)
+                subcal.dirty = True # its file may have been removed by a save in between
+                self.selected_subcal_index = op[2]
+            else:
+                self.subcalendars.remove(subcal)
+            self.invalidate_visible_subcals()
+            self.redraw = True
 
 
     def init_color_pairs(self):
@@ -108,32 +171,6 @@ class UI:
         self.mainwin = curses.newwin(self.mainwin_h, self.mainwin_w, self.mainwin_y, self.mainwin_x)
         self.promptwin = curses.newwin(self.promptwin_h, self.promptwin_w, self.promptwin_y, self.promptwin_x)
 
-    def handle_resize_old(self):
-        self.screen_h, self.screen_w = self.stdscr.getmaxyx()
-
-        # recalc layout
-        self.mainwin_hfactor = max(1, (self.screen_h - 2) // 6)
-        self.mainwin_wfactor = max(1, (self.screen_w - 2) // 7)
-        self.mainwin_h = self.mainwin_hfactor * 6 + 1
-        self.mainwin_w = self.mainwin_wfactor * 7 + 1
-
-        self.promptwin_y = min(self.mainwin_h, self.screen_h - 1)
-        self.promptwin_w = self.screen_w
-        self.promptwin_h = 1
-        self.promptwin_x = 0
-        self.mainwin_y = 0
-        self.mainwin_x = 0
-
-        # rebuild windows
-        del self.mainwin, self.promptwin
-        self.init_windows()
-
-        # mark for full redraw
-        self.redraw = True
-        
-        curses.flushinp()
-        self.stdscr.refresh()
-
     def handle_resize(self):
         self.screen_h, self.screen_w = self.stdscr.getmaxyx()
 
@@ -161,6 +198,18 @@ class UI:
         draw_screen(self)
 
 
+    @property
+    def visible_subcalendars(self):
+        if self._visible_subcals is None:
+            self._visible_subcals = tuple(cal for cal in self.subcalendars if not cal.hidden)
+        return self._visible_subcals
+
+
+    def invalidate_visible_subcals(self):
+        # call whenever a subcalendar is added, removed, or hidden/unhidden
+        self._visible_subcals = None
+
+
     @property
     def selected_subcal(self):
         return self.subcalendars[self.selected_subcal_index]
@@ -174,19 +223,22 @@ class UI:
         return tasks[self.selected_task_index % len(tasks)][1]
 
 
-    def month_has_changed(self, new_date):
-        return (new_date.month != self.selected_date.month) or (new_date.year != self.selected_date.year)
-
-
     def get_tasks_for_selected_day(self):
-        tasks = []
-        for cal in self.subcalendars:
-            if cal.hidden:
-                continue
-            for a in cal.tasks:
-                if (a.year, a.month, a.day) == (self.selected_date.year, self.selected_date.month, self.selected_date.day):
-                    tasks.append((cal, a))
-        return tasks
+        # selected_task, clamp_task_index, the actions and the status line all ask for
+        # this list per key, so rebuild it only when the day or the task set changed.
+        # callers must not mutate the returned list
+        d = self.selected_date
+        cals = self.visible_subcalendars
+        key = (d, cals, sum(cal.version for cal in cals))
+        if key != self._day_tasks_key:
+            tasks = []
+            append = tasks.append
+            for cal in cals:
+                for a in cal.tasks_on(d):
+                    append((cal, a))
+            self._day_tasks = tasks
+            self._day_tasks_key = key
+        return self._day_tasks
 
 
     def clamp_task_index(self):
@@ -200,21 +252,37 @@ class UI:
 
 
     def change_date(self, new_date, motion=0):
-        if self.month_has_changed(new_date):
+        old_date = self.selected_date
+        if new_date.month != old_date.month or new_date.year != old_date.year:
             self.redraw = True
 
-        self.last_selected_date = self.selected_date
+        # index 0 is always in range, so no clamp_task_index scan is needed here
         self.selected_date = new_date
         self.selected_task_index = 0
         self.task_scroll_offset = 0
-        self.clamp_task_index()
 
-        self.last_motion = f"{'+' if motion > 0 else ''}{motion}"
+        self.last_motion = _motion_str(motion)
+        self.reset_count()
+
+
+    def reset_count(self):
         self.count_buffer = ""
+        self.count = 0
 
 
     def main_loop(self):
         while self.running:
+            today = date.today()
+            if today != self.today:
+                # date rolled over while running, move the current date highlight
+                self.today = today
+                self.redraw = True
             draw_screen(self)
             key = handle_key(self)
             normal_mode_input(self, key)
+
+            # work through keys that are already queued (key repeat, pasted input)
+            # before repainting, so a burst of input costs a single draw
+            while self.running and peek_key(self) != -1:
+                key = handle_key(self)
+                normal_mode_input(self, key)
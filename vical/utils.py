@@ -1,23 +1,32 @@
 # vical/utils.py
 import calendar
-from datetime import date, datetime
+import re
+from datetime import date
+from functools import lru_cache
+
+_DAY_ABBR = tuple(calendar.day_abbr[(i + 6) % 7] for i in range(7)) # shift so sunday = 0
+_MONTH_ABBR = tuple(calendar.month_abbr) # index 0 is ''
+_BAD_CHARS_RE = re.compile(r'[,<>:"/\\|\x00-\x1f]') # separators, path chars, ascii control chars (incl. tab, newline, esc)
 
 def contains_bad_chars(name: str) -> bool:
-    invalid_chars = {'\t', '\n', '\r', '\x1b', ',', '<', '>', ':', '"', '/', '\\', '|'}
-    if any(ch in invalid_chars for ch in name):
-        return True
-    if any(ord(ch) < 32 for ch in name):  # check for ascii control chars
-        return True
-    return False
+    return _BAD_CHARS_RE.search(name) is not None
     
 def get_day_name(index: int) -> str:
-    return calendar.day_abbr[(index + 6) % 7] # shift so sunday = 0
+    return _DAY_ABBR[index % 7]
 
 def get_month_name(month: int) -> str:
     if 1 <= month <= 12:
-        return calendar.month_abbr[month]
+        return _MONTH_ABBR[month]
     else:
         raise ValueError(f"Invalid month number: {month}")
 
 def get_first_day_offset(month, year):
-    return calendar.monthrange(year, month)[0] + 1
\ No newline at end of file
+    return calendar.monthrange(year, month)[0] + 1
+
+@lru_cache(maxsize=32)
+def get_month_grid(year: int, month: int) -> tuple:
+    # the 42 dates (6 weeks) shown for a month, starting from the last sunday before the 1st
+    first_of_month = date(year, month, 1)
+    offset = (first_of_month.weekday() + 1) % 7  # Mon=0 Sun=6
+    base = first_of_month.toordinal() - offset
+    return tuple(date.fromordinal(base + i) for i in range(42))